@@ -7,10 +7,15 @@ optimized for Xiaohongshu's image requirements.
 from __future__ import annotations
 
 import argparse
+import functools
+import glob
+import json
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
 # --- Constants ---
@@ -19,6 +24,7 @@ WIDTH = 1242
 HEIGHT = 1660
 PADDING = 80
 TEXT_AREA_WIDTH = WIDTH - PADDING * 2
+MAX_FILE_SIZE = 5 * 1024 * 1024  # Xiaohongshu upload limit: 5MB
 
 # Font discovery: macOS stores PingFang in different locations depending on version
 FONT_SEARCH_PATHS = [
@@ -26,10 +32,21 @@ FONT_SEARCH_PATHS = [
     "/System/Library/Fonts/Supplemental/PingFang.ttc",
 ]
 
+# macOS 15+ ships PingFang as a downloadable font asset
+FONT_ASSET_GLOBS = [
+    "/System/Library/AssetsV2/com_apple_MobileAsset_Font*/*.asset/AssetData/PingFang.ttc",
+]
+
+# Where a discovered AssetsV2 font path is remembered between runs
+FONT_CACHE_FILE = Path.home() / ".cache" / "xhs-autopilot" / "font_path.txt"
+
 # PingFang.ttc font indices (macOS standard ordering)
 # We try several indices and pick the first that reports "PingFang SC"
 FONT_INDEX_CANDIDATES = list(range(30))
 
+# Row index of a vertical gradient, shaped (HEIGHT, 1, 1) to broadcast over RGB
+_GRADIENT_ROWS = np.arange(HEIGHT, dtype=np.int32)[:, None, None]
+
 # Color schemes: (background_colors, text_color, accent_color)
 COLOR_SCHEMES: dict[str, dict] = {
     "warm": {
@@ -63,88 +80,187 @@ COLOR_SCHEMES: dict[str, dict] = {
 }
 
 
+@functools.lru_cache(maxsize=1)
 def _find_pingfang_font() -> str:
     """Locate PingFang.ttc on macOS, including AssetsV2 path on macOS 15+."""
     for path in FONT_SEARCH_PATHS:
         if Path(path).exists():
             return path
 
-    # macOS 15+: font stored in AssetsV2 directory, find via fc-list
+    # macOS 15+: font stored in AssetsV2 directory. Reuse the path found by a
+    # previous run, otherwise glob the known asset layout for it.
     try:
-        result = subprocess.run(
-            ["fc-list", "--format=%{file}\n"],
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        for line in result.stdout.splitlines():
-            if "PingFang.ttc" in line:
-                return line.strip()
-    except (FileNotFoundError, subprocess.TimeoutExpired):
+        cached = FONT_CACHE_FILE.read_text(encoding="utf-8").strip()
+        if cached and Path(cached).exists():
+            return cached
+    except OSError:
         pass
 
+    found = next((p for pattern in FONT_ASSET_GLOBS for p in glob.iglob(pattern)), "")
+
+    # Last resort for non-standard installs: ask fontconfig
+    if not found:
+        try:
+            result = subprocess.run(
+                ["fc-list", "--format=%{file}\n"],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
+            found = next(
+                (line.strip() for line in result.stdout.splitlines() if "PingFang.ttc" in line), ""
+            )
+        except (FileNotFoundError, subprocess.TimeoutExpired):
+            pass
+
+    if found:
+        try:
+            FONT_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            FONT_CACHE_FILE.write_text(found, encoding="utf-8")
+        except OSError:
+            pass
+        return found
+
     print("Warning: PingFang font not found, falling back to system default")
     return ""
 
 
-def _load_font(font_path: str, size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
-    """Load PingFang SC font at the given size.
+@functools.lru_cache(maxsize=4)
+def _find_pingfang_index(font_path: str, bold: bool = False) -> int:
+    """Find the TTC index of PingFang SC Semibold (bold) or Regular.
 
-    Scans TTC indices to find PingFang SC Semibold (bold) or Regular.
+    Falls back to index 0 if no matching face is found.
     """
     target_style = "Semibold" if bold else "Regular"
 
+    for idx in FONT_INDEX_CANDIDATES:
+        try:
+            font = ImageFont.truetype(font_path, 16, index=idx)
+            name = font.getname()
+            # name is (family, style) e.g. ("PingFang SC", "Semibold")
+            if "SC" in name[0] and target_style in name[1]:
+                return idx
+        except (OSError, IndexError):
+            break
+
+    return 0
+
+
+@functools.lru_cache(maxsize=32)
+def _load_font(font_path: str, size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
+    """Load PingFang SC font at the given size."""
     if font_path:
-        for idx in FONT_INDEX_CANDIDATES:
-            try:
-                font = ImageFont.truetype(font_path, size, index=idx)
-                name = font.getname()
-                # name is (family, style) e.g. ("PingFang SC", "Semibold")
-                if "SC" in name[0] and target_style in name[1]:
-                    return font
-            except (OSError, IndexError):
-                break
-
-        # Fallback: just use index 0
         try:
-            return ImageFont.truetype(font_path, size, index=0)
+            return ImageFont.truetype(font_path, size, index=_find_pingfang_index(font_path, bold))
         except OSError:
             pass
 
     return ImageFont.load_default()
 
 
-def _draw_gradient(img: Image.Image, color_top: tuple, color_bottom: tuple) -> None:
-    """Draw a vertical linear gradient on the image."""
-    draw = ImageDraw.Draw(img)
-    for y in range(HEIGHT):
-        ratio = y / HEIGHT
-        r = int(color_top[0] + (color_bottom[0] - color_top[0]) * ratio)
-        g = int(color_top[1] + (color_bottom[1] - color_top[1]) * ratio)
-        b = int(color_top[2] + (color_bottom[2] - color_top[2]) * ratio)
-        draw.line([(0, y), (WIDTH, y)], fill=(r, g, b))
+@functools.lru_cache(maxsize=8)
+def _gradient_image(color_top: tuple, color_bottom: tuple) -> Image.Image:
+    """Build a vertical linear gradient image.
+
+    The result is cached per color pair and shared; callers must copy it
+    before drawing on it.
+
+    Only one pixel column is interpolated; Pillow's nearest-neighbour resize
+    stretches it across the full width, which is exact for a vertical gradient.
+    Filling a full-canvas NumPy buffer instead is several times slower: Pillow
+    stores RGB as 4 bytes per pixel, so even Image.frombuffer has to copy it.
+    """
+    top = np.array(color_top, dtype=np.int32)
+    delta = np.array(color_bottom, dtype=np.int32) - top
+    # Integer-only top + delta * y / HEIGHT; floor division matches int()
+    # truncation because the interpolated value is never negative.
+    strip = (top + delta * _GRADIENT_ROWS // HEIGHT).astype(np.uint8)
+    return Image.fromarray(strip).resize((WIDTH, HEIGHT), Image.Resampling.NEAREST)
+
+
+@functools.lru_cache(maxsize=8)
+def _bold_background(solid: tuple, accent: tuple) -> Image.Image:
+    """Solid background with the large accent band used by the bold template.
+
+    Cached and shared like _gradient_image; copy before drawing on it. The
+    three bands are filled separately so no pixel is written twice.
+    """
+    band_top = HEIGHT // 4
+    band_bottom = HEIGHT * 3 // 4 + 1  # accent covers rows HEIGHT // 4 .. HEIGHT * 3 // 4
+    img = Image.new("RGB", (WIDTH, HEIGHT), None)
+    img.paste(solid, (0, 0, WIDTH, band_top))
+    img.paste(accent, (0, band_top, WIDTH, band_bottom))
+    img.paste(solid, (0, band_bottom, WIDTH, HEIGHT))
+    return img
+
+
+@functools.lru_cache(maxsize=16)
+def _advance_table(font: ImageFont.FreeTypeFont) -> dict[str, float]:
+    """Per-font char -> advance width table, filled lazily by _wrap_text."""
+    return {}
 
 
 def _wrap_text(text: str, font: ImageFont.FreeTypeFont, max_width: int) -> list[str]:
-    """Wrap text to fit within max_width pixels, handling CJK characters."""
+    """Wrap text to fit within max_width pixels, handling CJK characters.
+
+    Line width is the running sum of per-character advances, so each
+    character is measured once instead of re-measuring the whole line.
+    """
     lines: list[str] = []
-    current_line = ""
+    current_line: list[str] = []
+    current_width = 0.0
+    widths = _advance_table(font)
 
     for char in text:
-        test_line = current_line + char
-        bbox = font.getbbox(test_line)
-        if bbox[2] - bbox[0] > max_width and current_line:
-            lines.append(current_line)
-            current_line = char
+        width = widths.get(char)
+        if width is None:
+            width = widths[char] = font.getlength(char)
+        if current_width + width > max_width and current_line:
+            lines.append("".join(current_line))
+            current_line = [char]
+            current_width = width
         else:
-            current_line = test_line
+            current_line.append(char)
+            current_width += width
 
     if current_line:
-        lines.append(current_line)
+        lines.append("".join(current_line))
 
     return lines
 
 
+@functools.lru_cache(maxsize=32)
+def _line_height(font: ImageFont.FreeTypeFont) -> int:
+    """Height of a CJK glyph, used as the line height for a font."""
+    bbox = font.getbbox("测")
+    return bbox[3] - bbox[1]
+
+
+@functools.lru_cache(maxsize=256)
+def _text_width(font: ImageFont.FreeTypeFont, text: str) -> int:
+    """Rendered (ink) width of a single line of text."""
+    bbox = font.getbbox(text)
+    return bbox[2] - bbox[0]
+
+
+@functools.lru_cache(maxsize=4)
+def _circle_mask(radius: int) -> Image.Image:
+    """Filled circle mask covering the same pixels as draw.ellipse would."""
+    size = radius * 2 + 1
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse([(0, 0), (size - 1, size - 1)], fill=255)
+    return mask
+
+
+@functools.lru_cache(maxsize=32)
+def _text_mask(font: ImageFont.FreeTypeFont, text: str) -> Image.Image:
+    """Anti-aliased coverage mask of text, laid out as draw.text at (0, 0)."""
+    _, _, right, bottom = font.getbbox(text)
+    mask = Image.new("L", (right, bottom), 0)
+    ImageDraw.Draw(mask).text((0, 0), text, font=font, fill=255)
+    return mask
+
+
 def _draw_centered_text(
     draw: ImageDraw.Draw,
     text: str,
@@ -152,16 +268,20 @@ def _draw_centered_text(
     y: int,
     color: tuple,
     max_width: int = TEXT_AREA_WIDTH,
+    lines: list[str] | None = None,
 ) -> int:
-    """Draw centered, auto-wrapped text. Returns the Y position after text."""
-    lines = _wrap_text(text, font, max_width)
-    line_height = font.getbbox("测")[3] - font.getbbox("测")[1]
+    """Draw centered, auto-wrapped text. Returns the Y position after text.
+
+    Pass ``lines`` when the caller has already wrapped ``text`` (e.g. to
+    measure the block height) to skip wrapping it a second time.
+    """
+    if lines is None:
+        lines = _wrap_text(text, font, max_width)
+    line_height = _line_height(font)
     spacing = int(line_height * 0.4)
 
     for line in lines:
-        bbox = font.getbbox(line)
-        text_width = bbox[2] - bbox[0]
-        x = (WIDTH - text_width) // 2
+        x = (WIDTH - _text_width(font, line)) // 2
         draw.text((x, y), line, font=font, fill=color)
         y += line_height + spacing
 
@@ -179,7 +299,7 @@ def _draw_left_text(
 ) -> int:
     """Draw left-aligned, auto-wrapped text. Returns the Y position after text."""
     lines = _wrap_text(text, font, max_width)
-    line_height = font.getbbox("测")[3] - font.getbbox("测")[1]
+    line_height = _line_height(font)
     spacing = int(line_height * 0.4)
 
     for line in lines:
@@ -199,8 +319,7 @@ def render_gradient(
     font_path: str,
 ) -> Image.Image:
     """Gradient background with centered large title."""
-    img = Image.new("RGB", (WIDTH, HEIGHT))
-    _draw_gradient(img, scheme["gradient"][0], scheme["gradient"][1])
+    img = _gradient_image(scheme["gradient"][0], scheme["gradient"][1]).copy()
     draw = ImageDraw.Draw(img)
 
     title_font = _load_font(font_path, 96, bold=True)
@@ -208,29 +327,28 @@ def render_gradient(
 
     # Vertically center the title block
     title_lines = _wrap_text(title, title_font, TEXT_AREA_WIDTH)
-    line_h = title_font.getbbox("测")[3] - title_font.getbbox("测")[1]
+    line_h = _line_height(title_font)
     total_height = len(title_lines) * (line_h + int(line_h * 0.4))
 
     if subtitle:
         sub_font = _load_font(font_path, 48, bold=False)
-        total_height += 80 + (sub_font.getbbox("测")[3] - sub_font.getbbox("测")[1])
+        total_height += 80 + _line_height(sub_font)
     else:
         sub_font = None
 
     start_y = (HEIGHT - total_height) // 2
-    y = _draw_centered_text(draw, title, title_font, start_y, text_color)
+    y = _draw_centered_text(draw, title, title_font, start_y, text_color, lines=title_lines)
 
     if subtitle and sub_font:
         y += 40
-        sub_color = (*text_color[:3],) if len(text_color) == 3 else text_color
-        _draw_centered_text(draw, subtitle, sub_font, y, sub_color)
+        _draw_centered_text(draw, subtitle, sub_font, y, text_color)
 
     # Decorative line
     line_y = start_y - 60
     line_width = 200
     draw.line(
         [(WIDTH // 2 - line_width // 2, line_y), (WIDTH // 2 + line_width // 2, line_y)],
-        fill=(*text_color[:3],),
+        fill=text_color,
         width=3,
     )
 
@@ -303,21 +421,9 @@ def render_list(
         # Number circle
         circle_x = PADDING + 20
         circle_r = 28
-        draw.ellipse(
-            [
-                (circle_x - circle_r, y - 4),
-                (circle_x + circle_r, y + circle_r * 2 - 4),
-            ],
-            fill=scheme["accent"],
-        )
-        num_bbox = num_font.getbbox(str(i))
-        num_w = num_bbox[2] - num_bbox[0]
-        draw.text(
-            (circle_x - num_w // 2, y - 2),
-            str(i),
-            font=num_font,
-            fill=(255, 255, 255),
-        )
+        img.paste(scheme["accent"], (circle_x - circle_r, y - 4), _circle_mask(circle_r))
+        num_w = _text_width(num_font, str(i))
+        img.paste((255, 255, 255), (circle_x - num_w // 2, y - 2), _text_mask(num_font, str(i)))
 
         # Item text
         y = _draw_left_text(draw, item, item_font, item_x, y, scheme["text"], item_max_width)
@@ -333,25 +439,21 @@ def render_bold(
     font_path: str,
 ) -> Image.Image:
     """Bold poster style with oversized text."""
-    img = Image.new("RGB", (WIDTH, HEIGHT), scheme["solid"])
+    img = _bold_background(scheme["solid"], scheme["accent"]).copy()
     draw = ImageDraw.Draw(img)
 
-    # Large background accent shape
-    draw.rectangle(
-        [(0, HEIGHT // 4), (WIDTH, HEIGHT * 3 // 4)],
-        fill=scheme["accent"],
-    )
-
     title_font = _load_font(font_path, 128, bold=True)
     text_on_accent = scheme["text_on_gradient"]
 
     # Title centered on accent block
     title_lines = _wrap_text(title, title_font, TEXT_AREA_WIDTH - 40)
-    line_h = title_font.getbbox("测")[3] - title_font.getbbox("测")[1]
+    line_h = _line_height(title_font)
     total_h = len(title_lines) * (line_h + int(line_h * 0.4))
     start_y = (HEIGHT - total_h) // 2
 
-    _draw_centered_text(draw, title, title_font, start_y, text_on_accent, TEXT_AREA_WIDTH - 40)
+    _draw_centered_text(
+        draw, title, title_font, start_y, text_on_accent, TEXT_AREA_WIDTH - 40, lines=title_lines
+    )
 
     if subtitle:
         sub_font = _load_font(font_path, 48, bold=False)
@@ -378,6 +480,14 @@ TEMPLATES = {
 }
 
 
+def _default_output_dir() -> Path:
+    """Create and return a timestamped run directory under workspace/."""
+    timestamp = datetime.now(tz=timezone(timedelta(hours=8))).strftime("%Y%m%d_%H%M%S")
+    output_dir = Path(__file__).parent.parent / "workspace" / timestamp
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return output_dir
+
+
 def generate_cover(
     title: str,
     subtitle: str | None = None,
@@ -385,15 +495,21 @@ def generate_cover(
     color: str = "warm",
     output: str | None = None,
     items: list[str] | None = None,
+    font_path: str | None = None,
 ) -> str:
-    """Generate a cover image and return the output path."""
+    """Generate a cover image and return the output path.
+
+    font_path skips font discovery when the caller has already resolved it
+    ("" means use Pillow's default font).
+    """
     if template not in TEMPLATES:
         raise ValueError(f"Unknown template: {template}. Choose from: {', '.join(TEMPLATES)}")
     if color not in COLOR_SCHEMES:
         raise ValueError(f"Unknown color: {color}. Choose from: {', '.join(COLOR_SCHEMES)}")
 
     scheme = COLOR_SCHEMES[color]
-    font_path = _find_pingfang_font()
+    if font_path is None:
+        font_path = _find_pingfang_font()
 
     if template == "list":
         img = render_list(title, subtitle, scheme, font_path, items=items)
@@ -402,18 +518,17 @@ def generate_cover(
         img = renderer(title, subtitle, scheme, font_path)
 
     if not output:
-        timestamp = datetime.now(tz=timezone(timedelta(hours=8))).strftime("%Y%m%d_%H%M%S")
-        output_dir = Path(__file__).parent.parent / "workspace" / timestamp
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output = str(output_dir / "cover.png")
+        output = str(_default_output_dir() / "cover.png")
 
     output_path = Path(output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    img.save(str(output_path), "PNG", optimize=True)
+    # Fast zlib level first; the slow optimizing encoder is only worth it when
+    # the result would otherwise exceed Xiaohongshu's size limit.
+    img.save(str(output_path), "PNG", compress_level=1)
+    if output_path.stat().st_size > MAX_FILE_SIZE:
+        img.save(str(output_path), "PNG", optimize=True)
 
-    # Verify file size (Xiaohongshu limit: 5MB)
-    size_mb = output_path.stat().st_size / (1024 * 1024)
-    if size_mb > 5:
+    if output_path.stat().st_size > MAX_FILE_SIZE:
         # Re-save as JPEG if PNG too large
         jpeg_path = output_path.with_suffix(".jpg")
         img.save(str(jpeg_path), "JPEG", quality=90, optimize=True)
@@ -428,9 +543,39 @@ def generate_cover(
     return output
 
 
+def generate_covers(jobs: list[dict], max_workers: int | None = None) -> list[str]:
+    """Generate several covers in parallel and return their output paths.
+
+    Each job is a dict of generate_cover keyword arguments. Results are in job
+    order. Jobs without an output are written to one shared run directory as
+    cover_<index>.png, so concurrent jobs never share a path.
+    """
+    outputs = [job["output"] for job in jobs if job.get("output")]
+    duplicates = sorted({output for output in outputs if outputs.count(output) > 1})
+    if duplicates:
+        raise ValueError(f"Batch jobs share output paths: {', '.join(duplicates)}")
+
+    if len(outputs) < len(jobs):
+        output_dir = _default_output_dir()
+        jobs = [
+            job if job.get("output") else {**job, "output": str(output_dir / f"cover_{i}.png")}
+            for i, job in enumerate(jobs, 1)
+        ]
+
+    # Resolve the font once in the parent and hand it to every worker, so no
+    # worker repeats discovery (glob / fc-list) or the not-found warning.
+    font_path = _find_pingfang_font()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(generate_cover, **{"font_path": font_path, **job}) for job in jobs
+        ]
+        return [future.result() for future in futures]
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Generate Xiaohongshu cover images")
-    parser.add_argument("--title", required=True, help="Main title text")
+    parser.add_argument("--title", help="Main title text")
     parser.add_argument("--subtitle", default=None, help="Subtitle or list items (separated by |)")
     parser.add_argument(
         "--template",
@@ -451,8 +596,23 @@ def main() -> None:
         default=None,
         help="List items for 'list' template (space-separated)",
     )
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help="JSON file with a list of generate_cover jobs, rendered in parallel: "
+        '[{"title": ..., "template": ..., "color": ..., "output": ...}]',
+    )
 
     args = parser.parse_args()
+    if args.batch:
+        try:
+            generate_covers(json.loads(Path(args.batch).read_text(encoding="utf-8")))
+        except ValueError as e:
+            parser.error(str(e))
+        return
+    if not args.title:
+        parser.error("--title is required unless --batch is given")
+
     generate_cover(
         title=args.title,
         subtitle=args.subtitle,
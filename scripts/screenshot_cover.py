@@ -3,42 +3,105 @@
 from __future__ import annotations
 
 import argparse
+import json
 import sys
 from pathlib import Path
 
 from playwright.sync_api import sync_playwright
 
 
+class ShotRunner:
+    """Reuse one Chromium instance across several screenshots.
+
+    Browser startup dominates a single screenshot, so batch jobs should share
+    a runner. Each shot still gets a fresh browser context (viewport, storage).
+    """
+
+    def __enter__(self) -> ShotRunner:
+        self._playwright = sync_playwright().start()
+        try:
+            self._browser = self._playwright.chromium.launch()
+        except BaseException:
+            self._playwright.stop()
+            raise
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._browser.close()
+        self._playwright.stop()
+
+    def shot(self, html_path: str, output_path: str, width: int = 1242, height: int = 1660) -> str:
+        html_file = Path(html_path).resolve()
+        if not html_file.exists():
+            raise FileNotFoundError(f"{html_file} not found")
+
+        output = Path(output_path).resolve()
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        context = self._browser.new_context(
+            viewport={"width": width, "height": height}, device_scale_factor=1
+        )
+        try:
+            page = context.new_page()
+            # Wait for the load event, then for web fonts to finish layout,
+            # instead of sleeping for a fixed time.
+            page.goto(f"file://{html_file}", wait_until="load")
+            page.evaluate("document.fonts.ready.then(() => true)")
+            page.screenshot(path=str(output), type="png")
+        finally:
+            context.close()
+
+        print(f"Screenshot saved: {output}")
+        print(f"  Size: {width}x{height}px")
+        return str(output)
+
+
 def screenshot_html(html_path: str, output_path: str, width: int = 1242, height: int = 1660) -> str:
     html_file = Path(html_path).resolve()
     if not html_file.exists():
         print(f"Error: {html_file} not found")
         sys.exit(1)
 
-    output = Path(output_path).resolve()
-    output.parent.mkdir(parents=True, exist_ok=True)
+    with ShotRunner() as runner:
+        return runner.shot(html_path, output_path, width, height)
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page(viewport={"width": width, "height": height}, device_scale_factor=1)
-        page.goto(f"file://{html_file}")
-        page.wait_for_timeout(500)
-        page.screenshot(path=str(output), type="png")
-        browser.close()
 
-    print(f"Screenshot saved: {output}")
-    print(f"  Size: {width}x{height}px")
-    return str(output)
+def screenshot_many(jobs: list[dict]) -> list[str]:
+    """Screenshot several pages with a single browser launch.
+
+    Each job takes the same keys as screenshot_html: html_path, output_path,
+    and optionally width and height. Raises FileNotFoundError for a missing
+    HTML file; screenshots taken before it are kept.
+    """
+    with ShotRunner() as runner:
+        return [runner.shot(**job) for job in jobs]
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Screenshot HTML to PNG")
-    parser.add_argument("--html", required=True, help="Path to HTML file")
-    parser.add_argument("--output", required=True, help="Output PNG path")
+    parser.add_argument("--html", help="Path to HTML file")
+    parser.add_argument("--output", help="Output PNG path")
     parser.add_argument("--width", type=int, default=1242)
     parser.add_argument("--height", type=int, default=1660)
+    parser.add_argument(
+        "--batch",
+        default=None,
+        help="JSON file with a list of jobs: "
+        '[{"html_path": ..., "output_path": ..., "width": ..., "height": ...}]',
+    )
     args = parser.parse_args()
-    screenshot_html(args.html, args.output, args.width, args.height)
+
+    if args.batch:
+        jobs = json.loads(Path(args.batch).read_text(encoding="utf-8"))
+        try:
+            screenshot_many(jobs)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elif args.html and args.output:
+        screenshot_html(args.html, args.output, args.width, args.height)
+    else:
+        parser.error("either --batch or both --html and --output are required")
 
 
 if __name__ == "__main__":